@@ -0,0 +1,78 @@
+"""
+Consistency check for prediction.py: the numba kernel and the fallback loop
+must produce the same predictions for the same inputs. The generated archive
+deliberately contains duplicated timestamps (overlapping exports), missing
+intraday slots and a prediction year inside the historical range (year-delta
+ties). Exits non-zero on any divergence.
+"""
+import os
+import sys
+import tempfile
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+import prediction
+
+def build_files(directory: str) -> List[str]:
+	rng = np.random.default_rng(0)
+	file_paths = []
+
+	for year in range(2019, 2026):
+		idx = pd.date_range(f'{year}-01-01', f'{year}-12-31 23:00', freq='60min')
+		# Punch random gaps into each year so some years miss individual
+		# time slots on days they otherwise cover
+		idx = idx[rng.random(len(idx)) > 0.05]
+		frame = pd.DataFrame({'value': np.round(rng.normal(100, 20, len(idx)), 2)}, index=idx)
+		frame.index.name = 'timestamp'
+		path = os.path.join(directory, f'{year}.csv')
+		frame.to_csv(path)
+		file_paths.append(path)
+
+	# Overlapping export: the first quarter of 2023 appears a second time
+	# with different values, duplicating those timestamps in the archive
+	idx = pd.date_range('2023-01-01', '2023-03-31 23:00', freq='60min')
+	frame = pd.DataFrame({'value': np.round(rng.normal(100, 20, len(idx)), 2)}, index=idx)
+	frame.index.name = 'timestamp'
+	path = os.path.join(directory, 'export_overlap.csv')
+	frame.to_csv(path)
+	file_paths.append(path)
+
+	return file_paths
+
+def main() -> int:
+	if not prediction._HAS_NUMBA:
+		print('numba not installed; nothing to compare')
+		return 0
+
+	weekday_groups = {'Mon-Thu': [0, 1, 2, 3], 'Friday': [4], 'Saturday': [5], 'Sunday': [6]}
+	holiday_map = {pd.Timestamp('2022-12-26'): 6}
+
+	with tempfile.TemporaryDirectory() as directory:
+		file_paths = build_files(directory)
+
+		# 2022 sits inside the historical range, so nearer and farther
+		# years tie on the year delta; 2026 is the plain forecast case
+		for period in (('2022-01-01', '2022-12-31 23:45'), ('2026-01-01', '2026-03-31 23:45')):
+			kernel = prediction.predict_next_year(file_paths, period, weekday_groups, '60min', holiday_map)
+			prediction._HAS_NUMBA = False
+			try:
+				fallback = prediction.predict_next_year(file_paths, period, weekday_groups, '60min', holiday_map)
+			finally:
+				prediction._HAS_NUMBA = True
+
+			kernel_values = kernel['Predicted Value'].to_numpy()
+			fallback_values = fallback['Predicted Value'].to_numpy()
+			if not np.allclose(kernel_values, fallback_values, rtol=1e-9, atol=0.0, equal_nan=True):
+				mismatch = ~np.isclose(kernel_values, fallback_values, rtol=1e-9, atol=0.0, equal_nan=True)
+				print(f'{period}: {mismatch.sum()} of {len(mismatch)} slots differ between kernel and fallback')
+				for i in np.flatnonzero(mismatch)[:5]:
+					print(f'  {kernel["Date"].iloc[i]}: kernel={kernel_values[i]} fallback={fallback_values[i]}')
+				return 1
+			print(f'{period}: kernel and fallback agree on {len(kernel_values)} slots')
+
+	return 0
+
+if __name__ == '__main__':
+	sys.exit(main())
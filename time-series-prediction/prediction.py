@@ -1,51 +1,200 @@
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import argparse
+import json
 import os
+from functools import lru_cache
 from typing import List, Tuple, Dict, Optional
 
+try:
+	import pyarrow  # noqa: F401
+	_CSV_ENGINE = 'pyarrow'
+except ImportError:
+	_CSV_ENGINE = 'c'
+
+try:
+	from numba import njit, prange
+	_HAS_NUMBA = True
+except ImportError:
+	_HAS_NUMBA = False
+
 def load_historical_data(file_paths: List[str]) -> pd.DataFrame:
 	"""
 	Load historical time series data from multiple files.
-	Each file should contain a time-indexed DataFrame.
+	Each file should contain a time-indexed DataFrame with a 'value' column.
+	Parses with the multi-threaded pyarrow engine when pyarrow is installed
+	and stores values as float32 to halve the memory footprint.
 	"""
-	historical_data = pd.concat([pd.read_csv(file_path, parse_dates=[0], index_col=0) for file_path in file_paths])
-	historical_data = historical_data.sort_index()
-	return historical_data
+	frames = [pd.read_csv(file_path, parse_dates=[0], index_col=0, engine=_CSV_ENGINE, dtype={'value': 'float32'})
+			  for file_path in file_paths]
+
+	# Strip timezone awareness up front (as UTC wall-clock): every
+	# downstream index operation takes the much faster tz-naive codepath
+	for frame in frames:
+		if frame.index.tz is not None:
+			frame.index = frame.index.tz_convert('UTC').tz_localize(None)
+
+	# Each file is already time-sorted, so a stable mergesort over the
+	# concatenated int64 timestamps only has to merge sorted runs — O(N)
+	# instead of a full re-sort of the combined index
+	timestamps = np.concatenate([frame.index.as_unit('ns').asi8 for frame in frames])
+	values = np.concatenate([frame['value'].to_numpy() for frame in frames])
+	order = np.argsort(timestamps, kind='mergesort')
 
-def find_nearest_comparison_days(target_date: pd.Timestamp, historical_data: pd.DataFrame, group: str, weekday_groups: Dict[str, List[int]], num_days: int = 4) -> pd.Index:
+	index = pd.DatetimeIndex(timestamps[order].view('datetime64[ns]'), name=frames[0].index.name)
+	return pd.DataFrame({'value': values[order]}, index=index)
+
+def find_nearest_comparison_days(target_date: pd.Timestamp, day_lookup: Dict[Tuple[int, int], np.ndarray], hist_year: np.ndarray, hist_group: np.ndarray, group_id: int, num_days: int = 4) -> np.ndarray:
 	"""
 	Find the nearest comparison days for the target date from the historical data.
-	Ensure the comparison days belong to the same group (e.g., Mon-Thu).
+	Looks up the candidate rows for the target's calendar (month, day) in the
+	precomputed day_lookup table and returns the positions belonging to the
+	num_days nearest years.
+	Ensure the comparison days belong to the same group (e.g., Mon-Thu),
+	identified by its integer id in the precomputed hist_group array.
 	"""
-	# Get the days that match the current group (e.g., Mon-Thu)
-	comparison_days = historical_data[historical_data.index.weekday.isin(weekday_groups[group])]
+	candidates = day_lookup.get((target_date.month, target_date.day))
+	if candidates is None:
+		return np.empty(0, dtype=np.intp)
+
+	# Keep only the days that match the current group (e.g., Mon-Thu)
+	candidates = candidates[hist_group[candidates] == group_id]
 
-	# Filter by calendar month and day for nearest match
-	comparison_days = comparison_days.loc[(comparison_days.index.month == target_date.month) &
-										  (comparison_days.index.day == target_date.day)]
+	years = hist_year[candidates]
+	distinct_years = np.unique(years)
+	if len(distinct_years) <= num_days:
+		return candidates
 
-	# Sort by the absolute difference in years and take the closest `num_days`
-	nearest_days = comparison_days.index.to_series().apply(lambda x: abs((x - target_date).days)).nsmallest(num_days).index
+	# Take the `num_days` years closest to the target year; the stable sort
+	# over the ascending distinct years makes delta ties resolve to the
+	# earlier year, deterministically
+	deltas = np.abs(distinct_years - target_date.year)
+	nearest = distinct_years[np.argsort(deltas, kind='stable')[:num_days]]
 
-	return nearest_days
+	return candidates[np.isin(years, nearest)]
 
-def apply_holiday_map(date: pd.Timestamp, holiday_map: Optional[Dict[pd.Timestamp, int]]) -> int:
+def apply_holiday_map(index: pd.DatetimeIndex, holiday_map: Optional[Dict[pd.Timestamp, int]]) -> np.ndarray:
 	"""
 	Apply holiday map to treat special days as a different weekday.
+	Resolves the effective weekday for every timestamp in the index in one
+	vectorized pass instead of one dict probe per timestamp.
 	"""
-	if date in holiday_map:
-		return holiday_map[date]
-	return date.weekday()
+	weekdays = np.asarray(index.weekday)
+
+	if not holiday_map:
+		return weekdays
 
-def get_weekday_group(weekday: int, weekday_groups: Dict[str, List[int]]) -> str:
+	# Compare on the underlying int64 nanoseconds: membership is a binary
+	# search into the sorted holiday keys instead of hashing one Timestamp
+	# per slot
+	holiday_weekday = {pd.Timestamp(date).value: weekday for date, weekday in holiday_map.items()}
+	index_ns = index.as_unit('ns').asi8
+	holiday_ns = np.sort(np.fromiter(holiday_weekday, dtype=np.int64, count=len(holiday_weekday)))
+
+	nearest = np.minimum(np.searchsorted(holiday_ns, index_ns), len(holiday_ns) - 1)
+	mask = holiday_ns[nearest] == index_ns
+	if mask.any():
+		weekdays = weekdays.copy()
+		weekdays[mask] = [holiday_weekday[ns] for ns in index_ns[mask]]
+
+	return weekdays
+
+def weekday_group_lookup(weekday_groups: Dict[str, List[int]]) -> np.ndarray:
 	"""
-	Return the group label based on the supplied weekday groupings.
+	Build a 7-entry array mapping each weekday to its group label, so that
+	resolving a group is a single array index instead of a scan over the
+	supplied weekday groupings.
 	"""
+	lookup = np.empty(7, dtype=object)
 	for group, days in weekday_groups.items():
-		if weekday in days:
-			return group
-	raise ValueError(f'weekday {weekday} not in {weekday_groups}')
+		for day in days:
+			lookup[day] = group
+
+	missing = [day for day in range(7) if lookup[day] is None]
+	if missing:
+		raise ValueError(f'weekdays {missing} not in {weekday_groups}')
+
+	return lookup
+
+if _HAS_NUMBA:
+	@njit(parallel=True, cache=True)
+	def _predict_kernel(pred_key, pred_year, hist_key, hist_year, hist_values, num_days, out):
+		"""
+		Fill `out` with one prediction per slot, mirroring the selection of
+		find_nearest_comparison_days exactly: a slot's comparison days are
+		the historical days matching its packed key with the time-of-day
+		bits dropped, the `num_days` distinct years nearest to the target
+		year are kept (delta ties resolve to the earlier year), and every
+		row of those years at the slot's full key is averaged.
+		"""
+		n_hist = hist_key.shape[0]
+		if n_hist == 0:
+			for i in prange(pred_key.shape[0]):
+				out[i] = np.nan
+			return
+
+		# Per-year accumulators are indexed by offset from the oldest year
+		year_min = hist_year[0]
+		year_max = hist_year[0]
+		for j in range(n_hist):
+			if hist_year[j] < year_min:
+				year_min = hist_year[j]
+			if hist_year[j] > year_max:
+				year_max = hist_year[j]
+		n_years = year_max - year_min + 1
+
+		for i in prange(pred_key.shape[0]):
+			day_key = pred_key[i] >> 14
+			has_day = np.zeros(n_years, dtype=np.bool_)
+			value_sum = np.zeros(n_years, dtype=np.float64)
+			value_count = np.zeros(n_years, dtype=np.int64)
+			for j in range(n_hist):
+				if hist_key[j] >> 14 == day_key:
+					y = hist_year[j] - year_min
+					has_day[y] = True
+					if hist_key[j] == pred_key[i]:
+						value_sum[y] += hist_values[j]
+						value_count[y] += 1
+
+			# Candidate years in ascending order: every year that has the
+			# slot's calendar day in the right group, whether or not it
+			# also has the exact time slot
+			cand_year = np.empty(n_years, dtype=np.int64)
+			cand_delta = np.empty(n_years, dtype=np.int64)
+			n_cand = 0
+			for y in range(n_years):
+				if has_day[y]:
+					delta = year_min + y - pred_year[i]
+					if delta < 0:
+						delta = -delta
+					cand_year[n_cand] = year_min + y
+					cand_delta[n_cand] = delta
+					n_cand += 1
+
+			# Partial selection sort on (delta, year): nearest years first,
+			# ties to the earlier year — the same order the stable argsort
+			# in find_nearest_comparison_days produces
+			n_keep = n_cand if n_cand < num_days else num_days
+			total = 0.0
+			count = 0
+			for k in range(n_keep):
+				best = k
+				for m in range(k + 1, n_cand):
+					if (cand_delta[m] < cand_delta[best]
+							or (cand_delta[m] == cand_delta[best] and cand_year[m] < cand_year[best])):
+						best = m
+				if best != k:
+					cand_delta[k], cand_delta[best] = cand_delta[best], cand_delta[k]
+					cand_year[k], cand_year[best] = cand_year[best], cand_year[k]
+				y = cand_year[k] - year_min
+				total += value_sum[y]
+				count += value_count[y]
+
+			if count == 0:
+				out[i] = np.nan
+			else:
+				out[i] = total / count
 
 def predict_next_year(file_paths: List[str], prediction_period: Tuple[str, str], weekday_groups: Dict[str, List[int]], freq: str, holiday_map: Optional[Dict[pd.Timestamp, int]] = None) -> pd.DataFrame:
 	"""
@@ -64,33 +213,103 @@ def predict_next_year(file_paths: List[str], prediction_period: Tuple[str, str],
 	# Load multiple historical data files
 	historical_data = load_historical_data(file_paths)
 
-	predictions = []
+	# Translate the legacy 'T' minute alias (e.g. '15T'), which newer
+	# pandas releases no longer accept, to 'min'
+	if freq.endswith('T') and freq[:-1].isdigit():
+		freq = f'{freq[:-1]}min'
 
 	# Convert prediction period strings to Timestamps
 	start_date, end_date = pd.Timestamp(prediction_period[0]), pd.Timestamp(prediction_period[1])
+	pred_index = pd.date_range(start_date, end_date, freq=freq)
 
-	for target_date in pd.date_range(start_date, end_date, freq=freq):
+	# Keep the prediction index tz-naive as well, mirroring the historical
+	# index, so all key arrays are derived on the tz-naive codepath
+	if pred_index.tz is not None:
+		pred_index = pred_index.tz_convert('UTC').tz_localize(None)
 
-		# Adjust for holiday mapping if provided
-		weekday = apply_holiday_map(target_date, holiday_map) if holiday_map else target_date.weekday()
+	# Canonical prediction key arrays, computed once for every downstream
+	# consumer; small dtypes keep the per-slot masks cache-resident
+	pred_month = np.asarray(pred_index.month, dtype=np.int8)
+	pred_day = np.asarray(pred_index.day, dtype=np.int8)
+	pred_year = np.asarray(pred_index.year, dtype=np.int16)
+	pred_tod = np.asarray(pred_index.hour, dtype=np.int16) * 60 + np.asarray(pred_index.minute, dtype=np.int16)
 
-		# Determine the group for the target date's weekday
-		group = get_weekday_group(weekday, weekday_groups)
+	# Map each of the 7 weekdays to its group label once, instead of scanning
+	# weekday_groups per timestamp
+	group_of_weekday = weekday_group_lookup(weekday_groups)
 
-		# Find nearest comparison days based on calendar day and group
-		comparison_days = find_nearest_comparison_days(target_date, historical_data, group, weekday_groups)
+	# Cache the index-derived arrays once; every DatetimeIndex property
+	# access allocates a fresh array over the full history
+	hist_index = historical_data.index
+	hist_month = np.asarray(hist_index.month)
+	hist_day = np.asarray(hist_index.day)
+	hist_weekday = np.asarray(hist_index.weekday)
+	hist_year = np.asarray(hist_index.year)
+	# Flat float32 values; load_historical_data already stores float32, so
+	# this is a view, and it guards against float64 frames from other loaders
+	hist_values = historical_data['value'].to_numpy(dtype=np.float32, copy=False)
+
+	# Time-of-day as int16 minutes since midnight, derived straight from
+	# the int64 nanoseconds: equality masks against it are plain integer
+	# compares over contiguous memory instead of per-element comparisons
+	# of datetime.time objects
+	hist_tod = ((hist_index.asi8 // 60_000_000_000) % 1440).astype(np.int16)
+
+	# Resolve the effective weekday for every prediction timestamp at once,
+	# applying the holiday mapping where supplied
+	weekdays = apply_holiday_map(pred_index, holiday_map)
 
-		# Take the average of the corresponding interval values from the comparison days
-		comparison_data = historical_data.loc[comparison_days]
-		avg_value = comparison_data[comparison_data.index.time == target_date.time()].mean()
+	# Assign each group label a small integer id and materialize int8 group
+	# columns for both sides; group checks become single integer compares
+	# instead of list-membership tests
+	group_id = {group: gid for gid, group in enumerate(weekday_groups)}
+	group_id_of_weekday = np.array([group_id[group] for group in group_of_weekday], dtype=np.int8)
+	hist_group = group_id_of_weekday[hist_weekday]
+	pred_group = group_id_of_weekday[weekdays]
 
-		# Append the prediction
-		predictions.append((target_date, avg_value))
+	# Pack (group, month, day, time-of-day) into one uint32 key per row, so
+	# matching a slot is a single equality scan over one contiguous array
+	# instead of four separate boolean masks
+	hist_key = ((hist_group.astype(np.uint32) << 24) | (hist_month.astype(np.uint32) << 19)
+				| (hist_day.astype(np.uint32) << 14) | hist_tod.astype(np.uint32))
+	pred_key = ((pred_group.astype(np.uint32) << 24) | (pred_month.astype(np.uint32) << 19)
+				| (pred_day.astype(np.uint32) << 14) | pred_tod.astype(np.uint32))
+
+	if _HAS_NUMBA:
+		out = np.empty(len(pred_index), dtype=np.float64)
+		_predict_kernel(pred_key, pred_year, hist_key, hist_year, hist_values, 4, out)
+		return pd.DataFrame({'Date': pred_index, 'Predicted Value': out})
+
+	# Positions of the historical rows for each calendar (month, day); the
+	# candidate set per day is invariant across the prediction window, so
+	# the per-timestamp lookup drops from O(N_hist) to O(#years)
+	day_lookup = (pd.DataFrame({'month': hist_month, 'day': hist_day, 'pos': np.arange(len(hist_month))})
+				  .groupby(['month', 'day'])['pos'].apply(np.array).to_dict())
+
+	# The comparison-day selection only depends on the calendar day, the
+	# target year and the group — one distinct key per predicted day, not
+	# per interval — so memoize it across the intraday timestamps
+	@lru_cache(maxsize=None)
+	def nearest_positions(month: int, day: int, year: int, group: int) -> np.ndarray:
+		target = pd.Timestamp(year=year, month=month, day=day)
+		return find_nearest_comparison_days(target, day_lookup, hist_year, hist_group, group)
+
+	# Write each prediction straight into a preallocated output array
+	# instead of accumulating 35k (Timestamp, value) tuples
+	out = np.empty(len(pred_index), dtype=np.float64)
+
+	for i in range(len(pred_index)):
+
+		# Find nearest comparison days based on calendar day and group
+		positions = nearest_positions(pred_month[i], pred_day[i], pred_year[i], pred_group[i])
 
-	# Convert predictions to a DataFrame
-	prediction_df = pd.DataFrame(predictions, columns=['Date', 'Predicted Value'])
+		# Take the average of the corresponding interval values from the
+		# comparison days; the packed-key equality covers the time-of-day
+		positions = positions[hist_key[positions] == pred_key[i]]
+		# Average float32 inputs with a float64 accumulator for stability
+		out[i] = hist_values[positions].mean(dtype=np.float64) if len(positions) else np.nan
 
-	return prediction_df
+	return pd.DataFrame({'Date': pred_index, 'Predicted Value': out})
 
 def main():
 	# Create an argument parser
@@ -102,16 +321,18 @@ def main():
 	parser.add_argument('--end_date', required=True, help='End date for the prediction period (e.g., 2025-12-31).')
 	parser.add_argument('--weekday_groups', required=True, help='Weekday groupings (e.g., {"Mon-Thu": [0,1,2,3], "Friday": [4]}).')
 	parser.add_argument('--holiday_map', required=False, help='Optional holiday map (e.g., {"2024-12-25": 5}).', default=None)
-	parser.add_argument('--freq', required=False, help='Frequency for prediction intervals (e.g., 15T for 15 minutes, 60T for 1 hour).', default='15T')
+	parser.add_argument('--freq', required=False, help='Frequency for prediction intervals (e.g., 15min for 15 minutes, 60min for 1 hour).', default='15min')
 
 	# Parse the arguments
 	args = parser.parse_args()
 
-	# Convert weekday_groups from string to dictionary
-	weekday_groups = eval(args.weekday_groups)  # Using eval to convert the string to a dictionary. Use with caution.
+	# Parse weekday_groups from its JSON representation
+	weekday_groups = json.loads(args.weekday_groups)
 
-	# Convert holiday_map from string to dictionary (if supplied)
-	holiday_map = eval(args.holiday_map) if args.holiday_map else None
+	# Parse holiday_map (if supplied) and convert its keys to Timestamps
+	holiday_map = None
+	if args.holiday_map:
+		holiday_map = {pd.Timestamp(date): int(weekday) for date, weekday in json.loads(args.holiday_map).items()}
 
 	# Define prediction period as tuple
 	prediction_period = (args.start_date, args.end_date)